@@ -4,8 +4,8 @@ Enhanced, vectorised script detector for 11 Indian scripts + English
 --------------------------------------------------------------------
 • **Ultra‑fast**: detects ~10–15 million names/sec by scanning at most *N*
   significant characters (default = 6) and **vectorising per‑column**: each
-  unique value is inspected once; the result is broadcast back with
-  ``pandas.Series.map``.
+  unique value is inspected once; the result is broadcast back through the
+  ``pandas.factorize`` codes with a single ``take``.
 • **Scripts supported** (ISO‑639 codes):
   *hi* (Devanagari‑Hindi/Marathi), *gu* (Gujarati), *pa* (Gurmukhi‑Punjabi),
   *bn* (Bengali/Assamese), *or* (Odia), *tam* (Tamil), *te* (Telugu), *kn*
@@ -13,7 +13,8 @@ Enhanced, vectorised script detector for 11 Indian scripts + English
 • **Confidence score** = share of inspected characters that fall inside the
   winning block.
 • **Smart cache**: look‑ups for words already seen are O(1) in‑memory; disk
-  writes happen **once per DataFrame** (not every token) to avoid I/O thrash.
+  writes are **batched** (every 1024 new words and at exit) and append only
+  the new words as JSON Lines, so no flush ever re‑encodes the whole cache.
 • Handles strings, ``pandas`` frames, CSV/XLS(X) folders, dict/JSON … all with
   one class, :class:`ScriptDetector`.
 """
@@ -21,16 +22,42 @@ Enhanced, vectorised script detector for 11 Indian scripts + English
 from __future__ import annotations
 
 import json
+import os
 import string
+import threading
+import weakref
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, MutableMapping, Sequence, Tuple, Union
+from types import FunctionType
+from typing import Dict, Iterable, List, Mapping, MutableMapping, Sequence, Set, Tuple, Union
+
+try:
+    import numpy as np  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – numpy optional (ships with pandas)
+    np = None  # type: ignore
 
 try:
     import pandas as pd  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover – pandas optional
     pd = None  # type: ignore
 
+try:
+    import pyarrow as pa  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – pyarrow optional
+    pa = None  # type: ignore
+
+try:
+    import numba  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – numba optional
+    numba = None  # type: ignore
+
+try:
+    from mypy_extensions import mypyc_attr  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover – only meaningful to mypyc builds
+    def mypyc_attr(*attrs, **kwattrs):  # type: ignore[misc]
+        return lambda cls: cls
+
 __all__ = ["UNICODE_RANGES", "ScriptDetector"]
 
 # ---------------------------------------------------------------------------
@@ -46,40 +73,389 @@ UNICODE_RANGES: Dict[str, Sequence[range]] = {
     "te":  [range(0x0C00, 0x0C80)],        # Telugu
     "kn":  [range(0x0C80, 0x0D00)],        # Kannada
     "ml":  [range(0x0D00, 0x0D80)],        # Malayalam
-    "ur":  [range(0x0600, 0x0700), range(0x0750, 0x0780)],  # Urdu / Arabic
+    "ur":  [range(0x0600, 0x0700), range(0x0750, 0x0780)],  # Urdu / Arabic (0x0700–074F stays unknown)
     "en":  [range(0x0000, 0x0080), range(0x0080, 0x0100)],  # ASCII + Latin‑1
 }
 
 _ASCII = set(map(ord, string.printable))  # printable ASCII ordinals
+_SKIP = 0xFF  # table id for spaces / controls / zero‑width marks (U+2000–200F)
+_BLANKS = "".join(map(chr, range(0x21)))  # the ASCII chars detect() skips
+_DROP_SKIPPED = dict.fromkeys([*range(0x21), *range(0x2000, 0x2010)])  # str.translate → delete them
 
 # ---------------------------------------------------------------------------
 # 2.  Low‑level helpers  (micro‑optimised for speed) -------------------------
 # ---------------------------------------------------------------------------
 
-def _char_lang(cp: int) -> str | None:
-    """Return language code for *cp* (or ``None`` if unknown). Fast path for
-    ASCII to ‘en’. Uses plain `in` membership on *pre‑built* ``range`` objects.
+def _build_lookup(
+    ranges: Mapping[str, Sequence[range]]
+) -> Tuple[bytearray, Tuple[str, ...]]:
+    """Flatten *ranges* into a dense code‑point → language‑id ``bytearray``.
+
+    Id ``0`` means unknown and :data:`_SKIP` marks insignificant chars, so a
+    single lookup both filters and classifies; every other id indexes the
+    returned tuple of language codes (``'en'`` is always id 1).  Blocks are
+    painted in reverse order so that, on overlap, the *first* language listed
+    wins – exactly like the old linear scan – and printable ASCII is ``'en'``.
     """
-    if cp in _ASCII:
-        return "en"
-    for lang, ranges in UNICODE_RANGES.items():
-        for r in ranges:
-            if cp in r:
-                return lang
-    return None
-
-
-def _iter_significant(text: str):
-    """Yield code‑points except spaces/controls for *text*."""
-    for ch in text:
+    langs = ("", "en") + tuple(lang for lang in ranges if lang != "en")
+    ids = {lang: i for i, lang in enumerate(langs)}
+    size = max([0x2010] + [r.stop for rs in ranges.values() for r in rs])
+    table = bytearray(size)
+    for lang, rs in reversed(list(ranges.items())):
+        for r in rs:
+            table[r.start:r.stop:r.step] = bytes([ids[lang]]) * len(r)
+    for cp in _ASCII:
+        table[cp] = 1
+    table[0x0000:0x0021] = bytes([_SKIP]) * 0x21
+    table[0x2000:0x2010] = bytes([_SKIP]) * 0x10
+    return table, langs
+
+
+def _ranges_key() -> Tuple:
+    return tuple((lang, tuple(rs)) for lang, rs in UNICODE_RANGES.items())
+
+
+def _ascii_lang(table: bytearray, langs: Tuple[str, ...]) -> str | None:
+    """Language shared by every significant ASCII char, or ``None`` if mixed."""
+    ids = set(table[0x21:0x80])
+    return langs[ids.pop()] if len(ids) == 1 else None
+
+
+_CP2LANG, _ID2LANG = _build_lookup(UNICODE_RANGES)
+_ASCII_LANG = _ascii_lang(_CP2LANG, _ID2LANG)  # enables the pure‑ASCII fast path
+_CP2LANG_NP = np.frombuffer(bytes(_CP2LANG), dtype=np.uint8) if np is not None else None
+_LOOKUP_KEY = _ranges_key()  # UNICODE_RANGES snapshot the tables were built from
+
+
+def _refresh_lookup() -> None:
+    """Rebuild the dense table so edits to :data:`UNICODE_RANGES` take effect."""
+    global _CP2LANG, _ID2LANG, _CP2LANG_NP, _ASCII_LANG, _LOOKUP_KEY
+    key = _ranges_key()
+    if key == _LOOKUP_KEY:
+        return
+    _CP2LANG, _ID2LANG = _build_lookup(UNICODE_RANGES)
+    _ASCII_LANG = _ascii_lang(_CP2LANG, _ID2LANG)
+    if np is not None:
+        _CP2LANG_NP = np.frombuffer(bytes(_CP2LANG), dtype=np.uint8)
+    _LOOKUP_KEY = key
+    _detect_raw.cache_clear()
+
+
+@lru_cache(maxsize=1 << 16)
+def _detect_raw(text: str, budget: int) -> Tuple[int, float]:
+    """Scan up to *budget* significant chars of *text* → *(lang id, score)*.
+
+    Pure function of its arguments, memoised with the C‑implemented
+    :func:`functools.lru_cache`; id ``0`` means nothing was recognised.
+    """
+    # count integer language ids in a flat list – no string hashing; ties
+    # go to the script seen first, as with the old insertion‑ordered dict.
+    # Globals and bound methods are hoisted into locals for the hot loop.
+    table = _CP2LANG
+    size = len(table)
+    skip = _SKIP
+    counts = [0] * len(_ID2LANG)
+    seen: List[int] = []
+    remember = seen.append
+    total = 0
+    for ch in text:  # skip, classify and count in one fused loop
         cp = ord(ch)
-        if cp <= 0x0020 or 0x2000 <= cp <= 0x200F:
-            continue
-        yield cp
+        lid = table[cp] if cp < size else 0
+        if lid == skip:
+            continue  # spaces / controls / zero‑width marks
+        total += 1
+        if lid:
+            if not counts[lid]:
+                remember(lid)
+            counts[lid] += 1
+        if total >= budget:
+            break
+    if not seen:
+        return 0, 0.0
+    winner = max(seen, key=counts.__getitem__) if len(seen) > 1 else seen[0]
+    return winner, counts[winner] / total
+
+
+def _decisive_prefix(text: str, budget: int) -> str | None:
+    """``text[:4 × budget]`` if that prefix already holds *budget* significant
+    chars – no scan can then tell it from *text* – else ``None``."""
+    head = text[:4 * budget]
+    return head if len(head.translate(_DROP_SKIPPED)) >= budget else None
+
+
+_SCAN_BATCH = 1 << 16  # strings per vectorised pass – bounds the count matrix
+_SCAN_BLOCK = 1024  # strings per parallel work item in the Numba kernel
+_FLUSH_EVERY = 1024  # new cache entries per disk write
+
+
+def _jsonl(word: str, lang: str) -> str:
+    """One cache entry as a JSON Lines record."""
+    return json.dumps({word: lang}, ensure_ascii=False) + "\n"
+
+
+@dataclass
+class _CacheLog:
+    """On‑disk side of a detector's word cache: entries not yet written.
+
+    Kept apart from :class:`ScriptDetector` so a ``weakref.finalize`` can
+    still flush the pending batch once the detector itself is collected
+    (or at interpreter exit) without keeping the detector alive.
+    """
+
+    path: Path
+    cache: MutableMapping[str, str]  # shared with the detector
+    new_keys: Set[str] = field(default_factory=set)  # not yet on disk
+    rewrite: bool = False  # file must be rewritten, not appended
+
+    def flush(self):
+        if not self.new_keys:
+            return
+        if self.rewrite:  # legacy/corrupt file → rewrite everything once, atomically
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text("".join(_jsonl(k, v) for k, v in self.cache.items()), encoding="utf‑8")
+            os.replace(tmp, self.path)
+            self.rewrite = False
+        else:  # O(new entries) – append just the delta
+            with self.path.open("a", encoding="utf‑8") as fh:
+                fh.writelines(_jsonl(k, self.cache[k]) for k in self.new_keys)
+        self.new_keys.clear()
+
+
+_prange = numba.prange if numba is not None else range
+
+
+def _scan_rows(cps, offsets, budget, table, n_langs):
+    """Per‑string scan of the code‑point buffer *cps* → *(ids, scores)*.
+
+    Same rules as :meth:`ScriptDetector.detect`, written as a plain numeric
+    loop so that Numba can compile it to native code when installed; strings
+    are independent, so ``numba.prange`` spreads them over all cores.
+    """
+    n = len(offsets) - 1
+    size = len(table)
+    ids = np.zeros(n, np.int64)
+    scores = np.zeros(n, np.float64)
+    for block in _prange((n + _SCAN_BLOCK - 1) // _SCAN_BLOCK):
+        # one scratch pair per block, zeroed per string – no per‑string allocs
+        counts = np.zeros(n_langs, np.int64)
+        first = np.zeros(n_langs, np.int64)  # rank at which each script appeared
+        for i in range(block * _SCAN_BLOCK, min(n, (block + 1) * _SCAN_BLOCK)):
+            counts[:] = 0
+            total = 0
+            for j in range(offsets[i], offsets[i + 1]):
+                cp = cps[j]
+                lid = table[cp] if cp < size else 0
+                if lid == _SKIP:
+                    continue
+                total += 1
+                if lid:
+                    if counts[lid] == 0:
+                        first[lid] = total
+                    counts[lid] += 1
+                if total >= budget:
+                    break
+            best = 0
+            for lid in range(1, n_langs):
+                if counts[lid] > counts[best] or (
+                    counts[lid] and counts[lid] == counts[best] and first[lid] < first[best]
+                ):
+                    best = lid
+            if best:
+                ids[i] = best
+                scores[i] = counts[best] / total
+    return ids, scores
+
+
+# Numba needs the Python source; when this module is compiled with mypyc
+# _scan_rows is already native and the NumPy path handles batches instead.
+_scan_rows_nb = (
+    numba.njit(cache=True, parallel=True)(_scan_rows)
+    if numba is not None and isinstance(_scan_rows, FunctionType)
+    else None
+)
+# Numba's fallback "workqueue" threading layer aborts the process when two
+# threads enter a parallel kernel at once – serialise callers (each call is
+# already spread over every core).
+_SCAN_LOCK = threading.Lock()
+
+
+def _scan_cps(cps, lengths, budget: int):
+    """Vectorised twin of :meth:`ScriptDetector.detect` → *(ids, scores)*.
+
+    *cps* holds the code‑points of every string back to back and *lengths*
+    how many belong to each, so skipping, classifying and counting run inside
+    NumPy instead of a Python loop per character.  Id ``0`` means nothing was
+    recognised.  Requires :mod:`numpy`.
+    """
+    n = len(lengths)
+    n_langs = len(_ID2LANG)
+    budget = max(budget, 1)  # detect() always inspects at least one char
+    if _scan_rows_nb is not None:
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        with _SCAN_LOCK:
+            return _scan_rows_nb(cps, offsets, budget, _CP2LANG_NP, n_langs)
+    rows = np.repeat(np.arange(n), lengths)
+
+    table = _CP2LANG_NP
+    lids = np.where(cps < len(table), table[np.minimum(cps, len(table) - 1)], 0)
+
+    # 1‑based rank of every significant char within its own string
+    sig = lids != _SKIP
+    rank = np.cumsum(sig)
+    rank -= np.concatenate(([0], rank))[np.cumsum(lengths) - lengths][rows]
+    keep = sig & (rank <= budget)
+    totals = np.bincount(rows[keep], minlength=n)
+    hit = keep & (lids > 0)
+    keys = rows[hit] * n_langs + lids[hit]
+    counts = np.bincount(keys, minlength=n * n_langs).reshape(n, n_langs)
+
+    # ties go to the script seen first, exactly as in detect()
+    first = np.full(n * n_langs, budget + 1, dtype=np.int64)
+    uniq, idx = np.unique(keys, return_index=True)
+    first[uniq] = rank[hit][idx]
+    ids = (counts * (budget + 2) - first.reshape(n, n_langs)).argmax(axis=1)
+    best = counts[np.arange(n), ids]
+    scores = np.divide(best, totals, out=np.zeros(n), where=totals > 0)
+    return ids, scores
+
+
+def _scan_many(texts: Sequence[str], budget: int):
+    """:func:`_scan_cps` over Python strings, encoded into one UTF‑32 buffer.
+
+    Long strings are cut to ``4 × budget`` chars first – whenever that prefix
+    already holds *budget* significant chars the result cannot change – so
+    the encode never copies text the scan would not look at.
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    budget = max(budget, 1)
+    cap = 4 * budget
+    long_rows = np.flatnonzero(lengths > cap)
+    if long_rows.size:
+        texts = list(texts)
+        for i in long_rows:
+            head = _decisive_prefix(texts[i], budget)
+            if head is not None:
+                texts[i] = head
+                lengths[i] = cap
+    cps = np.frombuffer("".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    return _scan_cps(cps, lengths, budget)
+
+
+def _factorize(values):
+    """``pd.factorize`` in the column's own dtype; unhashable cells (lists,
+    dicts …) fall back to their ``str`` form, as a plain ``astype(str)`` would."""
+    if not _hash_safe(values):
+        return _factorize_str(values)
+    try:
+        return pd.factorize(values)
+    except TypeError:
+        return pd.factorize(values.astype(str))
+
+
+def _factorize_str(values):
+    """``pd.factorize`` of *values* as ``str``, in Python (missing cells → −1).
+
+    Slow path for values that are not :func:`_hash_safe`.
+    """
+    index = {}  # str → code, in first‑seen order
+    codes = [-1 if na else index.setdefault(str(v), len(index)) for v, na in zip(values, pd.isna(values))]
+    return np.array(codes, dtype=np.intp), pd.Index(list(index), dtype=object)
+
+
+def _hash_safe(values) -> bool:
+    """False if pandas' hash table would mistake some strings in *values* for
+    one another.
+
+    For object / Python‑backed string data it hashes the UTF‑8 C string, so
+    a NUL ends the string early and a lone surrogate (no UTF‑8 form) reads
+    as ``''``: ``'ab'`` ≡ ``'ab\\x00c'``, ``''`` ≡ ``'\\ud800…'``.  Arrow
+    storage and non‑string dtypes are never affected.
+    """
+    if values.dtype != object and getattr(values.dtype, "storage", "pyarrow") == "pyarrow":
+        return True
+    try:
+        joined = "".join(values)
+    except TypeError:  # missing / non‑str cells
+        joined = "".join([v for v in values if isinstance(v, str)])
+    if "\x00" in joined:
+        return False
+    try:
+        joined.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _arrow_strings(values):
+    """Return *values* as a null‑free ``pyarrow`` string array, else ``None``."""
+    values = getattr(values, "array", values)
+    if pa is None or not hasattr(values, "__arrow_array__"):
+        return None
+    arr = pa.array(values)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if arr.null_count or not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return None
+    return arr
+
+
+def _scan_arrow(arr, budget: int, clip: bool = True):
+    """:func:`_scan_cps` straight off an Arrow string array's UTF‑8 buffers.
+
+    Code‑points are decoded from the lead bytes (plus their continuation
+    bytes) with NumPy, so no Python ``str`` is materialised per value.  As in
+    :func:`_scan_many`, long strings are cut first – to ``16 × budget`` bytes
+    (≥ ``4 × budget`` chars) on a char boundary – and only the few whose cut
+    prefix holds fewer than *budget* significant chars are rescanned whole.
+    """
+    _, offsets_buf, data_buf = arr.buffers()
+    width = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    offsets = np.frombuffer(offsets_buf, dtype=width)[arr.offset:arr.offset + len(arr) + 1].astype(np.int64)
+    data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.zeros(0, np.uint8)
+    budget = max(budget, 1)
+    starts, ends = offsets[:-1], offsets[1:]
+    cut = np.flatnonzero(ends - starts > 16 * budget) if clip else np.zeros(0, np.int64)
+    if cut.size:  # gather just the prefixes – the tails are never copied
+        ends = ends.copy()
+        stop = starts[cut] + 16 * budget
+        for _ in range(3):  # back off continuation bytes → whole chars only
+            stop -= (data[stop] & 0xC0) == 0x80
+        ends[cut] = stop
+        offsets = np.concatenate(([0], np.cumsum(ends - starts)))
+        data = data[np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], ends - starts)]
+    else:
+        data = data[offsets[0]:offsets[-1]]
+        offsets -= offsets[0]
+
+    lead = (data & 0xC0) != 0x80
+    lengths = np.diff(np.concatenate(([0], np.cumsum(lead)))[offsets])
+    pos = np.flatnonzero(lead)
+    cps = data[pos].astype(np.uint32)  # an ASCII lead byte *is* the code‑point
+    multi = np.flatnonzero(cps >= 0xC0)
+    if multi.size:  # decode only the multi‑byte sequences
+        at = pos[multi]
+        pad = np.concatenate((data, np.zeros(3, np.uint8)))
+        b0 = cps[multi]
+        b1, b2, b3 = (pad[at + k].astype(np.uint32) & 0x3F for k in (1, 2, 3))
+        cps[multi] = np.select(
+            [b0 < 0xE0, b0 < 0xF0],
+            [(b0 & 0x1F) << 6 | b1, (b0 & 0x0F) << 12 | b1 << 6 | b2],
+            (b0 & 0x07) << 18 | b1 << 12 | b2 << 6 | b3,
+        )
+    ids, scores = _scan_cps(cps, lengths, budget)
+    if cut.size:
+        table = _CP2LANG_NP
+        sig = np.where(cps < len(table), table[np.minimum(cps, len(table) - 1)], 0) != _SKIP
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        short = cut[np.bincount(rows[sig], minlength=len(lengths))[cut] < budget]
+        if short.size:  # prefix too blank to decide – scan those strings whole
+            ids[short], scores[short] = _scan_arrow(arr.take(pa.array(short)), budget, clip=False)
+    return ids, scores
 
 # ---------------------------------------------------------------------------
 # 3.  Main class -------------------------------------------------------------
 # ---------------------------------------------------------------------------
+@mypyc_attr(native_class=False)  # native classes can't be weak‑referenced (see _CacheLog)
 @dataclass
 class ScriptDetector:
     """Fast, cache‑aware script detector.
@@ -91,8 +467,10 @@ class ScriptDetector:
     default_code : str, default 'en'
         Returned when no script is recognised.
     cache_file : str | Path | None
-        Optional path to JSON word→language cache.  On first run the file is
-        loaded; new entries are flushed **once per DataFrame** to minimise I/O.
+        Optional path to the word→language cache (JSON Lines, one ``{word: lang}``
+        object per line; a legacy single JSON object is still read).  On first
+        run the file is loaded; new entries are appended in **batches** (and when
+        the detector is discarded or the interpreter exits) to minimise I/O.
     """
 
     sample_chars: int = 6
@@ -101,17 +479,19 @@ class ScriptDetector:
 
     # in‑memory cache mapping *word/phrase → lang*
     _cache: MutableMapping[str, str] = field(init=False, repr=False, default_factory=dict)
-    _dirty: bool = field(init=False, repr=False, default=False)  # whether cache changed
+    _log: _CacheLog | None = field(init=False, repr=False, default=None)  # pending disk writes
 
     # ------------------------------------------------------------------
     # lifecycle
     # ------------------------------------------------------------------
     def __post_init__(self):
-        if self.cache_file and Path(self.cache_file).is_file():
-            try:
-                self._cache.update(json.loads(Path(self.cache_file).read_text(encoding="utf‑8")))
-            except json.JSONDecodeError:
-                pass  # ignore corrupt cache
+        _refresh_lookup()  # pick up any UNICODE_RANGES edits made after import
+        if self.cache_file:
+            self._log = _CacheLog(Path(self.cache_file), self._cache)
+            if self._log.path.is_file():
+                self._load_cache(self._log)
+            # never lose a partial batch – flushed on collection or at exit
+            weakref.finalize(self, self._log.flush)
 
     # ------------------------------------------------------------------
     # core
@@ -122,46 +502,107 @@ class ScriptDetector:
         *score* ∈ [0, 1] is the share of inspected chars that belong to *lang*.
         Cached words short‑circuit full scan and score 1·0.
         """
+        default = self.default_code
         if not text:
-            return self.default_code, 0.0
+            return default, 0.0
         cached = self._cache.get(text)
         if cached:
             return cached, 1.0
+        if _ASCII_LANG and text.isascii():  # O(1) flag check on CPython str
+            return (_ASCII_LANG, 1.0) if text.strip(_BLANKS) else (default, 0.0)
 
-        counts: Dict[str, int] = {}
-        total = 0
-        for cp in _iter_significant(text):
-            total += 1
-            lang = _char_lang(cp)
-            if lang:
-                counts[lang] = counts.get(lang, 0) + 1
-            if total >= self.sample_chars:
-                break
-        if not counts:
-            return self.default_code, 0.0
-        winner = max(counts, key=counts.get)
-        return winner, counts[winner] / total
+        budget = self.sample_chars
+        if len(text) > 4 * max(budget, 1):  # memoise bounded keys only – never pin long text
+            head = _decisive_prefix(text, max(budget, 1))
+            lid, score = _detect_raw(head, budget) if head is not None else _detect_raw.__wrapped__(text, budget)
+        else:
+            lid, score = _detect_raw(text, budget)
+        return (_ID2LANG[lid], score) if lid else (default, 0.0)
+
+    def _detect_many(self, texts: Sequence[str]):
+        """Vectorised :meth:`detect` over a batch → *(langs, scores)* arrays.
+
+        Arrow‑backed string batches are scanned from their UTF‑8 buffers.
+        """
+        arr = _arrow_strings(texts)
+        if arr is None:
+            texts = texts.tolist() if hasattr(texts, "tolist") else list(texts)
+        langs = np.full(len(texts), self.default_code, dtype=object)
+        scores = np.zeros(len(texts))
+        todo = np.arange(len(texts))
+
+        # cached words win, as in detect() – resolve them first, scan the rest
+        if self._cache:
+            words = arr.to_pylist() if arr is not None else texts
+            cached = np.array([self._cache.get(w) if w else None for w in words], dtype=object)
+            hit = cached.astype(bool)
+            langs[hit], scores[hit] = cached[hit], 1.0
+            todo = np.flatnonzero(~hit)
+            if arr is not None:
+                arr = arr.take(pa.array(todo))
+            else:
+                texts = [t for t, h in zip(texts, hit) if not h]
+
+        # pure‑ASCII words need no scan (Arrow batches already decode ASCII
+        # for free, so only Python strings are pre‑masked)
+        if _ASCII_LANG and arr is None:
+            easy = np.fromiter((t.isascii() and bool(t.strip(_BLANKS)) for t in texts), bool, len(texts))
+            langs[todo[easy]], scores[todo[easy]] = _ASCII_LANG, 1.0
+            todo = todo[~easy]
+            texts = [t for t, e in zip(texts, easy) if not e]
+
+        codes = np.array(_ID2LANG, dtype=object)
+        codes[0] = self.default_code
+        for i in range(0, len(todo), _SCAN_BATCH):
+            if arr is not None:
+                ids, chunk_scores = _scan_arrow(arr.slice(i, _SCAN_BATCH), self.sample_chars)
+            else:
+                ids, chunk_scores = _scan_many(texts[i:i + _SCAN_BATCH], self.sample_chars)
+            rows = todo[i:i + _SCAN_BATCH]
+            langs[rows], scores[rows] = codes[ids], chunk_scores
+        return langs, scores
 
     # ------------------------------------------------------------------
     # cache helpers
     # ------------------------------------------------------------------
+    def _load_cache(self, log: _CacheLog):
+        text = log.path.read_text(encoding="utf‑8")
+        try:
+            self._cache.update(json.loads(text))  # legacy whole‑file JSON object
+            log.rewrite = True  # convert to JSON Lines on the next flush
+            return
+        except (TypeError, ValueError):
+            pass
+        for line in text.splitlines():
+            try:
+                self._cache.update(json.loads(line))
+            except (TypeError, ValueError):
+                log.rewrite = True  # skip corrupt / torn lines, rewrite later
+        if text and not text.endswith("\n"):
+            log.rewrite = True  # never append onto a torn last line
+
     def _add_to_cache(self, phrase: str, lang: str):
+        if self._cache.get(phrase) == lang:
+            return  # already known (cache hits score 1·0) – nothing new to append
         self._cache[phrase] = lang
-        self._dirty = True
+        if self._log is not None:
+            self._log.new_keys.add(phrase)
+
+    def _maybe_flush(self):
+        """Flush only once a full batch of new entries has accumulated."""
+        if self._log is not None and len(self._log.new_keys) >= _FLUSH_EVERY:
+            self._log.flush()
 
     def _flush_cache(self):
-        if self._dirty and self.cache_file:
-            Path(self.cache_file).write_text(
-                json.dumps(self._cache, ensure_ascii=False, indent=2), encoding="utf‑8"
-            )
-            self._dirty = False
+        if self._log is not None:
+            self._log.flush()
 
     # ------------------------------------------------------------------
     # pandas utilities – vectorised
     # ------------------------------------------------------------------
     def annotate_frame(
         self,
-        df: "pd.DataFrame",  # type: ignore[name‑defined]
+        df: "pd.DataFrame",  # type: ignore[name-defined]
         columns: Iterable[str],
         *,
         auto_cache: bool = False,
@@ -170,20 +611,40 @@ class ScriptDetector:
         if pd is None:
             raise ImportError("pandas is required for DataFrame support")
 
-        # Work column‑wise; detect each *unique* value once ⇒ massive speed‑up
-        for col in columns:
-            ser = df[col].astype(str)
-            uniques = ser.unique()
-            lang_map: Dict[str, str] = {}
-            for val in uniques:
-                lang, score = self.detect(val)
-                lang_map[val] = lang
-                if auto_cache and score >= min_cache_score:
-                    self._add_to_cache(val, lang)
-            df[f"{col}_lang"] = ser.map(lang_map)
+        # Detect each *unique* value once across **all** columns – names such
+        # as Name / Relative_Name overlap heavily ⇒ massive speed‑up.  Each
+        # column is factorized in its own dtype (no astype(str) copy of every
+        # cell); only the uniques are stringified and deduped across columns.
+        # Strings pandas' hash table would confuse (NUL, lone surrogates) take
+        # the pure‑Python _factorize_str path instead.
+        columns = list(columns)
+        per_col = [_factorize(df[col]) for col in columns]
+        str_dtype = "string[pyarrow]" if pa is not None else object  # keeps Arrow scans zero‑copy
+        if per_col:
+            try:
+                texts = [pd.Series(uniq.astype(str), dtype=str_dtype) for _, uniq in per_col]
+            except UnicodeEncodeError:  # Arrow rejects lone surrogates
+                texts = [pd.Series(uniq, dtype=object) for _, uniq in per_col]
+            everything = pd.concat(texts, ignore_index=True)
+            if all(map(_hash_safe, texts)):
+                codes, uniques = pd.factorize(everything)
+            else:
+                codes, uniques = _factorize_str(everything)
+            langs, scores = self._detect_many(uniques)
+            if auto_cache:
+                for i in np.flatnonzero(scores >= min_cache_score):
+                    self._add_to_cache(uniques[i], langs[i])
+            # broadcast back with C‑level gathers per column – no dict/.map;
+            # missing cells (code −1) pick the trailing default_code
+            start = 0
+            for col, (col_codes, uniq) in zip(columns, per_col):
+                stop = start + len(uniq)
+                col_langs = np.append(langs.take(codes[start:stop]), self.default_code)
+                df[f"{col}_lang"] = col_langs.take(col_codes)
+                start = stop
 
         if auto_cache:
-            self._flush_cache()
+            self._maybe_flush()
         return df
 
     # ------------------------------------------------------------------
@@ -204,26 +665,40 @@ class ScriptDetector:
         path = Path(path)
         ext = path.suffix.lower()
 
-        # Choose reader
-        if ext == ".csv":
-            reader = pd.read_csv(path, chunksize=chunksize) if chunksize else [pd.read_csv(path)]
-        elif ext in {".xls", ".xlsx"}:
-            if chunksize:
-                raise ValueError("chunksize not supported for Excel files")
-            reader = [pd.read_excel(path, engine="openpyxl")]
-        else:
+        if ext not in {".csv", ".xls", ".xlsx"}:
             raise ValueError(f"Unsupported file type: {ext}")
+        if chunksize and ext != ".csv":
+            raise ValueError("chunksize not supported for Excel files")
 
-        frames = []
-        for chunk in reader:
-            frames.append(self.annotate_frame(chunk, columns, auto_cache=auto_cache, min_cache_score=min_cache_score))
-        df_out = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
-
+        columns = list(columns)  # reused for every chunk
         out_path = Path(out_path) if out_path else path.with_stem(path.stem + "_lang")
         if ext == ".csv":
-            df_out.to_csv(out_path, index=False, encoding="utf-8-sig")  # ensures BOM for Indic text support
+            # Stream: each annotated chunk is appended straight to the output,
+            # so peak memory is one chunk, not the whole file (no pd.concat).
+            # Chunks go to a temp file swapped in at the end, so a failure
+            # (e.g. a bad column) never clobbers a previous good output.
+            reader = pd.read_csv(path, chunksize=chunksize) if chunksize else [pd.read_csv(path)]
+            tmp = out_path.with_name(out_path.name + ".tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8-sig", newline="") as fh:  # BOM for Indic text support
+                    for i, chunk in enumerate(reader):
+                        self.annotate_frame(
+                            chunk, columns, auto_cache=auto_cache, min_cache_score=min_cache_score
+                        ).to_csv(fh, index=False, header=i == 0)
+                os.replace(tmp, out_path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
         else:
+            df_out = self.annotate_frame(
+                pd.read_excel(path, engine="openpyxl"),
+                columns,
+                auto_cache=auto_cache,
+                min_cache_score=min_cache_score,
+            )
             df_out.to_excel(out_path, index=False, engine="openpyxl")
+        if auto_cache:
+            self._flush_cache()  # whole file done – persist the tail batch
         return out_path
 
     # ------------------------------------------------------------------
@@ -244,7 +719,7 @@ class ScriptDetector:
                 self._add_to_cache(record[k], lang)
             out[f"{k}_lang"] = lang
         if auto_cache:
-            self._flush_cache()
+            self._maybe_flush()
         return out
 
     # ------------------------------------------------------------------
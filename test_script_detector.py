@@ -0,0 +1,144 @@
+"""Differential checks: every scan path must agree with ``detect()``.
+
+``detect()`` is pinned to a plain re‑implementation of the original per‑char
+algorithm; the batch paths – NumPy :func:`_scan_cps`, the Numba kernel,
+:func:`_scan_arrow` and :meth:`ScriptDetector.annotate_frame` – are then
+compared with ``detect()`` on random strings, with and without numba /
+pyarrow.  Run with ``pytest``.
+"""
+
+from __future__ import annotations
+
+import random
+import string
+
+import pytest
+
+import script_detector as sd
+from script_detector import UNICODE_RANGES, ScriptDetector
+
+BUDGETS = [0, 1, 2, 6, 9]
+
+# chars from every block in the table, its holes (U+0700–074F), blanks and
+# zero‑width marks, astral / CJK, plus the cells pandas' hash table trips on
+_POOL = (
+    [chr(c) for c in range(0x00, 0x180)]
+    + [chr(c) for c in range(0x0590, 0x0E10)]
+    + [chr(c) for c in range(0x1FF0, 0x2020)]
+    + ["一", "\U0001f600", "￿", "\x00", "\ud800", "\udfff"]
+    + [" "] * 60
+)
+
+
+def _corpus(seed: int, n: int = 3000) -> list[str]:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        k = rnd.randint(0, 12) if rnd.random() < 0.8 else rnd.randint(40, 300)
+        text = "".join(rnd.choice(_POOL) for _ in range(k))
+        if rnd.random() < 0.1:  # blank‑heavy prefix → exercises the prefix cut
+            text = " " * rnd.randint(0, 80) + text
+        out.append(text)
+    return out + ["", "   ", "\x00abc", "\x00೯", "ab", "ab\x00c", "\ud800राम", "Dr. राम", "سعید"]
+
+
+def _reference(text: str, budget: int, default: str) -> tuple[str, float]:
+    """The original algorithm: dict counts, ties to the script seen first."""
+    counts: dict[str, int] = {}
+    total = 0
+    for ch in text:
+        cp = ord(ch)
+        if cp <= 0x20 or 0x2000 <= cp <= 0x200F:
+            continue
+        total += 1
+        if ch in string.printable:
+            lang: str | None = "en"
+        else:
+            lang = next((lg for lg, rs in UNICODE_RANGES.items() if any(cp in r for r in rs)), None)
+        if lang:
+            counts[lang] = counts.get(lang, 0) + 1
+        if total >= budget:
+            break
+    if not counts:
+        return default, 0.0
+    winner = max(counts, key=counts.__getitem__)
+    return winner, counts[winner] / total
+
+
+def _no_surrogates(texts: list[str]) -> list[str]:
+    return [t for t in texts if not any(0xD800 <= ord(c) < 0xE000 for c in t)]
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numba" and sd._scan_rows_nb is None:
+        pytest.skip("numba not installed")
+    if request.param == "numpy":
+        monkeypatch.setattr(sd, "_scan_rows_nb", None)
+    return request.param
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_detect_matches_reference(budget):
+    det = ScriptDetector(sample_chars=budget, default_code="xx")
+    for text in _corpus(budget):
+        lang, score = det.detect(text)
+        ref_lang, ref_score = _reference(text, budget, "xx")
+        assert lang == ref_lang and score == pytest.approx(ref_score), repr(text)
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_detect_many_matches_detect(budget, backend):
+    pytest.importorskip("numpy")
+    det = ScriptDetector(sample_chars=budget, default_code="xx")
+    texts = _corpus(100 + budget)
+    langs, scores = det._detect_many(texts)
+    for text, lang, score in zip(texts, langs, scores):
+        assert (lang, score) == pytest.approx(det.detect(text)), repr(text)
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+def test_scan_arrow_matches_detect(budget, backend):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    det = ScriptDetector(sample_chars=budget, default_code="xx")
+    texts = _no_surrogates(_corpus(200 + budget))  # not valid UTF‑8 → never in Arrow
+    values = pd.array(["pad"] * 3 + texts, dtype="string[pyarrow]")[3:]  # non‑zero offset
+    assert sd._arrow_strings(values) is not None
+    langs, scores = det._detect_many(values)
+    for text, lang, score in zip(texts, langs, scores):
+        assert (lang, score) == pytest.approx(det.detect(text)), repr(text)
+
+
+@pytest.mark.parametrize("surrogates", [False, True])
+@pytest.mark.parametrize("dtype", ["object", "string[python]", "string[pyarrow]"])
+@pytest.mark.parametrize("with_arrow", [True, False])
+def test_annotate_frame_matches_detect(dtype, with_arrow, surrogates, backend, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    if dtype == "string[pyarrow]" or with_arrow:
+        pytest.importorskip("pyarrow")
+    if dtype == "string[pyarrow]" and surrogates:
+        pytest.skip("lone surrogates are not valid UTF‑8 → never in Arrow")
+    if not with_arrow:
+        monkeypatch.setattr(sd, "pa", None)
+    det = ScriptDetector(sample_chars=4, default_code="xx")
+    texts = _corpus(300)
+    if not surrogates:  # kept apart: one surrogate must not hide a NUL mix‑up
+        texts = _no_surrogates(texts)
+    cols = {  # overlapping columns → cross‑column dedupe; a missing cell each
+        "A": texts + [None],
+        "B": texts[::-1] + [None],
+        "C": [t[:3] for t in texts] + [None],
+    }
+    df = pd.DataFrame({k: pd.Series(v, dtype=dtype) for k, v in cols.items()})
+    out = det.annotate_frame(df, list(cols))
+    for col, values in cols.items():
+        expected = [det.detect(v)[0] if v is not None else "xx" for v in values]
+        assert out[f"{col}_lang"].tolist() == expected, col
+
+
+def test_annotate_frame_unhashable_cells():
+    pd = pytest.importorskip("pandas")
+    det = ScriptDetector()
+    df = pd.DataFrame({"A": [["राम"], {"k": 1}, "राम", ("ਰ",)]})
+    assert det.annotate_frame(df, ["A"])["A_lang"].tolist() == ["en", "en", "hi", "en"]